@@ -1,42 +1,162 @@
 import dash
-from dash import dcc, html, Input, Output, callback
-import plotly.graph_objects as go
+from dash import dcc, html, Input, Output, State, ClientsideFunction
+from flask_compress import Compress
+import plotly.io as pio
 import plotly.express as px
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import numpy as np
 import calendar
+import os
 
 # Initialize the Dash app
 app = dash.Dash(__name__)
 
 server = app.server
 
-# Load and process the data
-def load_data():
-    """Load and process the CSV data for year-over-year analysis"""
-    # Read the CSV file
-    df = pd.read_csv('cleaned_data.csv')
+# Compress responses; the layout JSON carries the chart data
+server.config['COMPRESS_MIMETYPES'] = [
+    'application/json', 'text/html', 'application/javascript', 'text/javascript', 'text/css'
+]
+server.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+Compress(server)
+
+CSV_PATH = 'cleaned_data.csv'
+CACHE_PATH = 'cleaned_data.parquet'
+
+# Bump whenever build_cache() changes the columns, dtypes or row order it writes
+CACHE_VERSION = 7
+
+# Trace colours, with translucent variants for range bands
+COLORS = tuple(px.colors.qualitative.Set1)
+FILLCOLORS = tuple(color.replace('rgb', 'rgba').replace(')', ', 0.2)') for color in COLORS)
+
+# Charts are built as plain figure dicts; the browser applies the default template, resolved once here
+TEMPLATE = pio.templates[pio.templates.default].to_plotly_json()
+
+# Build the columnar cache from the CSV
+def build_cache():
+    """Parse the CSV once, derive the date columns and write them to the Parquet cache"""
+    # Read the CSV file, parsing the Date column to datetime
+    df = pd.read_csv(CSV_PATH, parse_dates=['Date'])
     
-    # Convert Date column to datetime
-    df['Date'] = pd.to_datetime(df['Date'])
+    # Prices are whole dollars, so store them in the smallest integer type that fits
+    df['Price'] = pd.to_numeric(df['Price'], downcast='integer')
     
     # Extract year, month, day, and day of year
-    df['Year'] = df['Date'].dt.year
-    df['Month'] = df['Date'].dt.month
-    df['Day'] = df['Date'].dt.day
-    df['DayOfYear'] = df['Date'].dt.dayofyear
-    df['MonthName'] = df['Date'].dt.month_name()
-    df['WeekOfYear'] = df['Date'].dt.isocalendar().week
+    df['Year'] = df['Date'].dt.year.astype('int16')
+    df['Month'] = df['Date'].dt.month.astype('int8')
+    df['Day'] = df['Date'].dt.day.astype('int8')
+    df['DayOfYear'] = df['Date'].dt.dayofyear.astype('int16')
+    df['MonthName'] = pd.Categorical(df['Date'].dt.month_name(),
+                                     categories=list(calendar.month_name)[1:], ordered=True)
+    df['WeekOfYear'] = df['Date'].dt.isocalendar().week.astype('int8')
+    df['Quarter'] = ((df['Month'] - 1) // 3 + 1).astype('int8')
+    
+    # Create month-day key (MMDD as an integer) for overlay comparisons
+    df['MonthDay'] = df['Month'].astype('int16') * 100 + df['Day'].astype('int16')
+    
+    # Store any other text columns as categoricals rather than object dtype
+    for col in df.select_dtypes(include='object').columns:
+        df[col] = df[col].astype('category')
+    
+    # Sort chronologically so group blocks are contiguous and each year is already in day-of-year order
+    df = df.sort_values('Date').reset_index(drop=True)
+    
+    # Tag the file with the cache version and swap it in atomically so concurrent workers never read a partial file
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata({**table.schema.metadata, b'cache_version': str(CACHE_VERSION).encode()})
+    tmp_path = f'{CACHE_PATH}.{os.getpid()}.tmp'
+    try:
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        # The app directory may be read-only; serve the parsed data without caching it
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return df
+
+def cache_is_fresh():
+    """Check that the cache exists, is newer than the CSV and was written by the current build_cache()"""
+    if not os.path.exists(CACHE_PATH) or os.path.getmtime(CACHE_PATH) < os.path.getmtime(CSV_PATH):
+        return False
+    
+    try:
+        metadata = pq.read_schema(CACHE_PATH).metadata or {}
+    except pa.ArrowInvalid:
+        return False
+    return metadata.get(b'cache_version') == str(CACHE_VERSION).encode()
+
+# Load and process the data
+def load_data():
+    """Load the processed data for year-over-year analysis, rebuilding the cache if it is stale"""
+    if cache_is_fresh():
+        df = pd.read_parquet(CACHE_PATH, engine='pyarrow')
+    else:
+        df = build_cache()
     
-    # Create month-day for overlay comparisons
-    df['MonthDay'] = df['Date'].dt.strftime('%m-%d')
+    # Use ordered categoricals for the grouping keys so groupbys take the integer-coded path
+    # (Parquet does not round-trip integer categoricals, so this is applied after reading)
+    for col in ['Year', 'Month', 'Quarter', 'WeekOfYear']:
+        df[col] = pd.Categorical(df[col], categories=sorted(df[col].unique()), ordered=True)
     
     return df
 
+# Precompute the aggregate tables
+def build_aggregates(df):
+    """Compute the per-year aggregate tables once so each year selection only needs to slice them"""
+    monthly = df.groupby(['Year', 'Month'], observed=True).agg({
+        'Price': ['mean', 'std']
+    }).round(2)
+    monthly.columns = ['AvgPrice', 'StdPrice']
+    monthly = monthly.reset_index()
+    
+    quarterly = df.groupby(['Year', 'Quarter'], observed=True).agg({
+        'Price': ['mean', 'min', 'max', 'std']
+    }).round(2)
+    quarterly.columns = ['AvgPrice', 'MinPrice', 'MaxPrice', 'StdPrice']
+    quarterly = quarterly.reset_index()
+    
+    weekly = df.groupby(['Year', 'WeekOfYear'], observed=True).agg({
+        'Price': 'mean'
+    }).round(2).reset_index()
+    
+    # One pass for every annual statistic used by the stats chart, volatility chart and summary table
+    annual = df.groupby('Year', observed=True)['Price'].agg(['count', 'mean', 'median', 'std', 'min', 'max'])
+    annual['RangePercent'] = (annual['max'] - annual['min']) / annual['mean'] * 100
+    annual = annual.round(2)
+    annual.columns = ['Days', 'Mean', 'Median', 'Std Dev', 'Min', 'Max', 'RangePercent']
+    annual = annual.reset_index()
+    
+    return monthly, quarterly, weekly, annual
+
 # Load the data
 df = load_data()
 
+MONTHLY_AGG, QUARTERLY_AGG, WEEKLY_AGG, ANNUAL_STATS = build_aggregates(df)
+
+# Per-year (day of year, price) arrays for the overlay chart
+OVERLAY_XY = {
+    year: (np.ascontiguousarray(group['DayOfYear'].to_numpy(dtype='int16')),
+           np.ascontiguousarray(group['Price'].to_numpy()))
+    for year, group in df.groupby('Year', observed=True, sort=False)
+}
+
 available_years = sorted(df['Year'].unique())
 
+COMPARISON_TYPES = [
+    {'label': 'Overlay by Day of Year', 'value': 'overlay'},
+    {'label': 'Monthly Averages', 'value': 'monthly'},
+    {'label': 'Quarterly Comparison', 'value': 'quarterly'},
+    {'label': 'Weekly Patterns', 'value': 'weekly'}
+]
+
+# Holds the per-year chart data so dropdown changes are handled in the browser
+chart_store = dcc.Store(id='chart-store')
+
 # Define the app layout
 app.layout = html.Div([
     html.Div([
@@ -60,12 +180,7 @@ app.layout = html.Div([
                 html.Label("Comparison Type:", style={'fontWeight': 'bold', 'marginBottom': 10}),
                 dcc.Dropdown(
                     id='comparison-type',
-                    options=[
-                        {'label': 'Overlay by Day of Year', 'value': 'overlay'},
-                        {'label': 'Monthly Averages', 'value': 'monthly'},
-                        {'label': 'Quarterly Comparison', 'value': 'quarterly'},
-                        {'label': 'Weekly Patterns', 'value': 'weekly'}
-                    ],
+                    options=COMPARISON_TYPES,
                     value='overlay',
                     style={'marginTop': 10, }
                 )
@@ -90,298 +205,233 @@ app.layout = html.Div([
         html.Div([
             html.H3("Year-over-Year Summary Statistics", style={'textAlign': 'center', 'marginTop': 30}),
             html.Div(id='summary-table')
-        ])
+        ]),
+        
+        chart_store
     ], style={'padding': 20, 'maxWidth': '1200px', 'margin': '0 auto'})
 ])
 
-@callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='charts', function_name='update'),
     [Output('main-comparison-chart', 'figure'),
      Output('summary-stats-chart', 'figure'),
      Output('volatility-chart', 'figure'),
      Output('summary-table', 'children')],
     [Input('year-dropdown', 'value'),
-     Input('comparison-type', 'value')]
+     Input('comparison-type', 'value')],
+    State('chart-store', 'data')
 )
-def update_charts(selected_years, comparison_type):
-    if not selected_years:
-        empty_fig = go.Figure()
-        empty_fig.add_annotation(text="Please select at least one year", 
-                               xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)
-        return empty_fig, empty_fig, empty_fig, html.Div("No data to display")
-    
-    filtered_df = df[df['Year'].isin(selected_years)].copy()
-    
-    # Create main comparison chart based on type
-    if comparison_type == 'overlay':
-        main_fig = create_overlay_chart(filtered_df)
-    elif comparison_type == 'monthly':
-        main_fig = create_monthly_chart(filtered_df)
-    elif comparison_type == 'quarterly':
-        main_fig = create_quarterly_chart(filtered_df)
-    else:  # weekly
-        main_fig = create_weekly_chart(filtered_df)
-    
-    # Create secondary charts
-    stats_fig = create_summary_stats_chart(filtered_df)
-    volatility_fig = create_volatility_chart(filtered_df)
-    
-    # Create summary table
-    summary_table = create_summary_table(filtered_df)
-    
-    return main_fig, stats_fig, volatility_fig, summary_table
 
-def create_overlay_chart(df):
-    """Create overlay chart showing all years on same day-of-year axis"""
-    fig = go.Figure()
-    
-    colors = px.colors.qualitative.Set1
-    
-    for i, year in enumerate(sorted(df['Year'].unique())):
-        year_data = df[df['Year'] == year].copy()
-        year_data = year_data.sort_values('DayOfYear')
-        
-        fig.add_trace(go.Scatter(
-            x=year_data['DayOfYear'],
-            y=year_data['Price'],
-            mode='lines',
-            name=str(year),
-            line=dict(color=colors[i % len(colors)], width=2),
-            hovertemplate=f'<b>{year}</b><br>Day: %{{x}}<br>Price: $%{{y}}<extra></extra>'
-        ))
-    
-    fig.update_layout(
-        title='Year-over-Year Price Comparison (Overlay by Day of Year)',
-        xaxis_title='Day of Year',
-        yaxis_title='Price ($)',
-        hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
-    
-    return fig
+# The builders below create the traces for a single year. The browser combines the
+# selected years and fills in each year's colour from its position (see assets/charts.js).
 
-def create_monthly_chart(df):
-    """Create monthly average comparison chart"""
-    monthly_data = df.groupby(['Year', 'Month']).agg({
-        'Price': ['mean', 'std']
-    }).round(2)
-    monthly_data.columns = ['AvgPrice', 'StdPrice']
-    monthly_data = monthly_data.reset_index()
-    
-    fig = go.Figure()
-    
-    colors = px.colors.qualitative.Set1
-    
-    for i, year in enumerate(sorted(monthly_data['Year'].unique())):
-        year_data = monthly_data[monthly_data['Year'] == year]
-        
-        fig.add_trace(go.Scatter(
-            x=year_data['Month'],
-            y=year_data['AvgPrice'],
-            mode='lines+markers',
-            name=str(year),
-            line=dict(color=colors[i % len(colors)], width=3),
-            marker=dict(size=8),
-            error_y=dict(type='data', array=year_data['StdPrice'], visible=True),
-            hovertemplate=f'<b>{year}</b><br>Month: %{{x}}<br>Avg Price: $%{{y:.2f}}<extra></extra>'
-        ))
-    
-    fig.update_layout(
-        title='Monthly Average Price Comparison',
-        xaxis_title='Month',
-        yaxis_title='Average Price ($)',
-        xaxis=dict(tickmode='array', tickvals=list(range(1, 13)), 
-                  ticktext=[calendar.month_abbr[i] for i in range(1, 13)]),
-        hovermode='x unified'
-    )
-    
-    return fig
+def create_overlay_traces(overlay_xy, year):
+    """Create the overlay trace for one year on the shared day-of-year axis"""
+    day_of_year, price = overlay_xy[year]
+    
+    return [dict(
+        type='scattergl',
+        x=day_of_year,
+        y=price,
+        mode='lines',
+        name=str(year),
+        line=dict(width=2),
+        hovertemplate=f'<b>{year}</b><br>Day: %{{x}}<br>Price: $%{{y}}<extra></extra>'
+    )]
 
-def create_quarterly_chart(df):
-    """Create quarterly comparison chart"""
-    df['Quarter'] = df['Date'].dt.quarter
-    quarterly_data = df.groupby(['Year', 'Quarter']).agg({
-        'Price': ['mean', 'min', 'max', 'std']
-    }).round(2)
-    quarterly_data.columns = ['AvgPrice', 'MinPrice', 'MaxPrice', 'StdPrice']
-    quarterly_data = quarterly_data.reset_index()
-    
-    fig = go.Figure()
-    
-    colors = px.colors.qualitative.Set1
-    
-    for i, year in enumerate(sorted(quarterly_data['Year'].unique())):
-        year_data = quarterly_data[quarterly_data['Year'] == year]
-        
-       
-        fig.add_trace(go.Scatter(
-            x=year_data['Quarter'],
-            y=year_data['AvgPrice'],
+OVERLAY_LAYOUT = dict(
+    title=dict(text='Year-over-Year Price Comparison (Overlay by Day of Year)'),
+    xaxis=dict(title=dict(text='Day of Year')),
+    yaxis=dict(title=dict(text='Price ($)')),
+    hovermode='x unified',
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+)
+
+def create_monthly_traces(monthly_agg, year):
+    """Create the monthly average trace for one year"""
+    year_data = monthly_agg[monthly_agg['Year'] == year]
+    
+    return [dict(
+        type='scatter',
+        x=year_data['Month'].to_numpy(),
+        y=year_data['AvgPrice'].to_numpy(),
+        mode='lines+markers',
+        name=str(year),
+        line=dict(width=3),
+        marker=dict(size=8),
+        error_y=dict(type='data', array=year_data['StdPrice'].to_numpy(), visible=True),
+        hovertemplate=f'<b>{year}</b><br>Month: %{{x}}<br>Avg Price: $%{{y:.2f}}<extra></extra>'
+    )]
+
+MONTHLY_LAYOUT = dict(
+    title=dict(text='Monthly Average Price Comparison'),
+    xaxis=dict(title=dict(text='Month'), tickmode='array', tickvals=list(range(1, 13)), 
+              ticktext=[calendar.month_abbr[i] for i in range(1, 13)]),
+    yaxis=dict(title=dict(text='Average Price ($)')),
+    hovermode='x unified'
+)
+
+def create_quarterly_traces(quarterly_agg, year):
+    """Create the quarterly average trace and min/max range band for one year"""
+    year_data = quarterly_agg[quarterly_agg['Year'] == year]
+    quarters = year_data['Quarter'].to_numpy()
+    
+    return [
+        dict(
+            type='scatter',
+            x=quarters,
+            y=year_data['AvgPrice'].to_numpy(),
             mode='lines+markers',
             name=f'{year} Avg',
-            line=dict(color=colors[i % len(colors)], width=3),
+            line=dict(width=3),
             marker=dict(size=10),
             hovertemplate=f'<b>{year} Q%{{x}}</b><br>Avg: $%{{y:.2f}}<extra></extra>'
-        ))
-        
-        
-        fig.add_trace(go.Scatter(
-            x=list(year_data['Quarter']) + list(year_data['Quarter'])[::-1],
-            y=list(year_data['MaxPrice']) + list(year_data['MinPrice'])[::-1],
-            fill='tonexty' if i > 0 else 'tozeroy',
-            fillcolor=colors[i % len(colors)].replace('rgb', 'rgba').replace(')', ', 0.2)'),
+        ),
+        # The browser sets fill to 'tozeroy' for the first selected year
+        dict(
+            type='scatter',
+            x=np.concatenate([quarters, quarters[::-1]]),
+            y=np.concatenate([year_data['MaxPrice'].to_numpy(), year_data['MinPrice'].to_numpy()[::-1]]),
+            fill='tonexty',
             line=dict(color='rgba(255,255,255,0)'),
             name=f'{year} Range',
             showlegend=True,
             hoverinfo='skip'
-        ))
-    
-    fig.update_layout(
-        title='Quarterly Price Comparison (Average with Min/Max Range)',
-        xaxis_title='Quarter',
-        yaxis_title='Price ($)',
-        xaxis=dict(tickmode='array', tickvals=[1, 2, 3, 4], 
-                  ticktext=['Q1', 'Q2', 'Q3', 'Q4'])
-    )
-    
-    return fig
+        )
+    ]
 
-def create_weekly_chart(df):
-    """Create weekly pattern comparison"""
-    weekly_data = df.groupby(['Year', 'WeekOfYear']).agg({
-        'Price': 'mean'
-    }).round(2).reset_index()
-    
-    fig = go.Figure()
-    
-    colors = px.colors.qualitative.Set1
-    
-    for i, year in enumerate(sorted(weekly_data['Year'].unique())):
-        year_data = weekly_data[weekly_data['Year'] == year]
-        
-        fig.add_trace(go.Scatter(
-            x=year_data['WeekOfYear'],
-            y=year_data['Price'],
-            mode='lines',
-            name=str(year),
-            line=dict(color=colors[i % len(colors)], width=2),
-            hovertemplate=f'<b>{year}</b><br>Week: %{{x}}<br>Avg Price: $%{{y:.2f}}<extra></extra>'
-        ))
-    
-    fig.update_layout(
-        title='Weekly Average Price Patterns',
-        xaxis_title='Week of Year',
-        yaxis_title='Average Price ($)',
-        hovermode='x unified'
-    )
-    
-    return fig
+QUARTERLY_LAYOUT = dict(
+    title=dict(text='Quarterly Price Comparison (Average with Min/Max Range)'),
+    xaxis=dict(title=dict(text='Quarter'), tickmode='array', tickvals=[1, 2, 3, 4], 
+              ticktext=['Q1', 'Q2', 'Q3', 'Q4']),
+    yaxis=dict(title=dict(text='Price ($)'))
+)
 
-def create_summary_stats_chart(df):
-    """Create summary statistics comparison chart"""
-    stats = df.groupby('Year').agg({
-        'Price': ['mean', 'median', 'min', 'max']
-    }).round(2)
-    stats.columns = ['Mean', 'Median', 'Min', 'Max']
-    stats = stats.reset_index()
-    
-    fig = go.Figure()
-    
-    
-    fig.add_trace(go.Bar(x=stats['Year'], y=stats['Mean'], name='Mean', 
-                        marker_color='lightblue', opacity=0.8))
-    fig.add_trace(go.Bar(x=stats['Year'], y=stats['Median'], name='Median', 
-                        marker_color='lightgreen', opacity=0.8))
-    
-    fig.update_layout(
-        title='Annual Price Statistics Comparison',
-        xaxis_title='Year',
-        yaxis_title='Price ($)',
-        barmode='group',
-        xaxis=dict(
-            type='category',
-        tickmode='array',
-        tickvals=stats['Year']
-    )
-    )
-    
-    return fig
+def create_weekly_traces(weekly_agg, year):
+    """Create the weekly average trace for one year"""
+    year_data = weekly_agg[weekly_agg['Year'] == year]
+    
+    return [dict(
+        type='scattergl',
+        x=year_data['WeekOfYear'].to_numpy(),
+        y=year_data['Price'].to_numpy(),
+        mode='lines',
+        name=str(year),
+        line=dict(width=2),
+        hovertemplate=f'<b>{year}</b><br>Week: %{{x}}<br>Avg Price: $%{{y:.2f}}<extra></extra>'
+    )]
 
-def create_volatility_chart(df):
-    """Create volatility comparison chart"""
-    volatility = df.groupby('Year').agg({
-        'Price': ['std', lambda x: (x.max() - x.min()) / x.mean() * 100]
-    }).round(2)
-    volatility.columns = ['StdDev', 'RangePercent']
-    volatility = volatility.reset_index()
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        x=volatility['Year'],
-        y=volatility['StdDev'],
-        name='Standard Deviation',
-        marker_color='coral',
-        yaxis='y'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=volatility['Year'],
-        y=volatility['RangePercent'],
-        mode='lines+markers',
-        name='Range as % of Mean',
-        marker=dict(color='darkred', size=8),
-        line=dict(color='darkred', width=3),
-        yaxis='y2'
-    ))
-    
-    fig.update_layout(
-        title='Price Volatility Comparison',
-        xaxis_title='Year',
-        yaxis=dict(title='Standard Deviation ($)', side='left'),
-        yaxis2=dict(title='Range as % of Mean', side='right', overlaying='y'),
-        legend=dict(x=0.01, y=0.99),
-        xaxis=dict(
-        type='category',
-        tickmode='array',
-        tickvals=volatility['Year']
-    )
+WEEKLY_LAYOUT = dict(
+    title=dict(text='Weekly Average Price Patterns'),
+    xaxis=dict(title=dict(text='Week of Year')),
+    yaxis=dict(title=dict(text='Average Price ($)')),
+    hovermode='x unified'
+)
+
+# Annual charts: the browser fills each trace's x with the selected years and its y
+# with the matching ANNUAL_STATS column
+SUMMARY_STATS_CHART = {
+    'columns': ['Mean', 'Median'],
+    'data': [
+        dict(type='bar', name='Mean', marker=dict(color='lightblue'), opacity=0.8),
+        dict(type='bar', name='Median', marker=dict(color='lightgreen'), opacity=0.8)
+    ],
+    'layout': dict(
+        title=dict(text='Annual Price Statistics Comparison'),
+        xaxis=dict(title=dict(text='Year'), type='category', tickmode='array'),
+        yaxis=dict(title=dict(text='Price ($)')),
+        barmode='group'
     )
-    
-    return fig
+}
 
-def create_summary_table(df):
-    """Create summary statistics table"""
-    summary = df.groupby('Year').agg({
-        'Price': ['count', 'mean', 'median', 'std', 'min', 'max']
-    }).round(2)
-    summary.columns = ['Days', 'Mean', 'Median', 'Std Dev', 'Min', 'Max']
-    summary = summary.reset_index()
-    
-    # Calculate year-over-year changes
-    summary['YoY Change (Mean)'] = summary['Mean'].pct_change() * 100
-    summary['YoY Change (Mean)'] = summary['YoY Change (Mean)'].round(2)
-    
-    
-    table_header = [html.Tr([html.Th(col) for col in ['Year'] + list(summary.columns[1:])])]
-    
-    table_rows = []
-    for _, row in summary.iterrows():
-        table_row = [html.Td(row['Year'])]
-        for col in summary.columns[1:]:
-            value = row[col]
-            if col == 'YoY Change (Mean)' and pd.notna(value):
-                color = 'green' if value > 0 else 'red' if value < 0 else 'black'
-                table_row.append(html.Td(f"{value:.2f}%", style={'color': color}))
-            elif pd.notna(value):
-                table_row.append(html.Td(f"{value:.2f}" if isinstance(value, float) else str(int(value))))
-            else:
-                table_row.append(html.Td("-"))
-        table_rows.append(html.Tr(table_row))
-    
-    return html.Table(
-        table_header + table_rows,
-        style={'width': '100%', 'textAlign': 'center', 'border': '1px solid #ddd'},
-        className='table table-striped'
+VOLATILITY_CHART = {
+    'columns': ['Std Dev', 'RangePercent'],
+    'data': [
+        dict(type='bar', name='Standard Deviation', marker=dict(color='coral'), yaxis='y'),
+        dict(
+            type='scatter',
+            mode='lines+markers',
+            name='Range as % of Mean',
+            marker=dict(color='darkred', size=8),
+            line=dict(color='darkred', width=3),
+            yaxis='y2'
+        )
+    ],
+    'layout': dict(
+        title=dict(text='Price Volatility Comparison'),
+        xaxis=dict(title=dict(text='Year'), type='category', tickmode='array'),
+        yaxis=dict(title=dict(text='Standard Deviation ($)'), side='left'),
+        yaxis2=dict(title=dict(text='Range as % of Mean'), side='right', overlaying='y'),
+        legend=dict(x=0.01, y=0.99)
     )
+}
+
+# Display format for each summary table column; the YoY column is added by the browser
+SUMMARY_FORMATS = {
+    'Year': '{:d}',
+    'Days': '{:d}',
+    'Mean': '{:.2f}',
+    'Median': '{:.2f}',
+    'Std Dev': '{:.2f}',
+    'Min': '{:.2f}',
+    'Max': '{:.2f}'
+}
+
+def create_summary_rows(annual_stats):
+    """Create the summary table row for each year, without the selection-dependent YoY cell"""
+    summary = annual_stats.assign(Year=annual_stats['Year'].astype(int))
+    
+    # Format each column once with its own format instead of dispatching per cell
+    formatted = summary[list(SUMMARY_FORMATS)].apply(
+        lambda col: col.map(SUMMARY_FORMATS[col.name].format).where(col.notna(), '-'))
+    
+    return {
+        str(year): html.Tr([html.Td(value) for value in row])
+        for year, row in zip(summary['Year'], formatted.itertuples(index=False, name=None))
+    }
+
+def build_chart_store():
+    """Collect the per-year traces, annual statistics and table rows the browser assembles charts from"""
+    main_charts = {
+        'overlay': (create_overlay_traces, OVERLAY_XY, OVERLAY_LAYOUT),
+        'monthly': (create_monthly_traces, MONTHLY_AGG, MONTHLY_LAYOUT),
+        'quarterly': (create_quarterly_traces, QUARTERLY_AGG, QUARTERLY_LAYOUT),
+        'weekly': (create_weekly_traces, WEEKLY_AGG, WEEKLY_LAYOUT)
+    }
+    annual = ANNUAL_STATS.assign(Year=ANNUAL_STATS['Year'].astype(str)).set_index('Year')
+    
+    return {
+        'template': TEMPLATE,
+        'colors': COLORS,
+        'fillcolors': FILLCOLORS,
+        'empty': {
+            'layout': {
+                'annotations': [dict(text="Please select at least one year",
+                                     xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)]
+            },
+            'table': html.Div("No data to display")
+        },
+        'main': {
+            comparison_type: {
+                'traces': {str(year): create_traces(source, year) for year in available_years},
+                'layout': layout
+            }
+            for comparison_type, (create_traces, source, layout) in main_charts.items()
+        },
+        'annual': annual[['Mean', 'Median', 'Std Dev', 'RangePercent']].to_dict('index'),
+        'stats': SUMMARY_STATS_CHART,
+        'volatility': VOLATILITY_CHART,
+        'table': {
+            'header': html.Tr([html.Th(col) for col in list(SUMMARY_FORMATS) + ['YoY Change (Mean)']]),
+            'rows': create_summary_rows(ANNUAL_STATS),
+            'shell': html.Table(
+                style={'width': '100%', 'textAlign': 'center', 'border': '1px solid #ddd'},
+                className='table table-striped'
+            )
+        }
+    }
+
+chart_store.data = build_chart_store()
 
 # Add CSS styling
 app.index_string = '''
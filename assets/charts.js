@@ -0,0 +1,82 @@
+// Clientside handler for the dropdowns. build_chart_store() in app.py ships the
+// traces, annual statistics and table rows for each year once; this assembles
+// the selected years instead of making a server roundtrip.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    charts: {
+        update: function(selectedYears, comparisonType, store) {
+            // Plotly mutates the figure it renders, so never hand out the stored objects
+            function clone(obj) {
+                return JSON.parse(JSON.stringify(obj));
+            }
+
+            function figure(data, layout) {
+                layout = clone(layout);
+                layout.template = store.template;
+                return {data: data, layout: layout};
+            }
+
+            if (!selectedYears || selectedYears.length === 0) {
+                return [
+                    figure([], store.empty.layout),
+                    figure([], store.empty.layout),
+                    figure([], store.empty.layout),
+                    store.empty.table
+                ];
+            }
+
+            var years = selectedYears
+                .filter(function(year) { return String(year) in store.annual; })
+                .sort(function(a, b) { return a - b; });
+
+            // Main chart: colour each year's traces by its position in the selection
+            var main = store.main[comparisonType] || store.main.weekly;
+            var mainData = [];
+            years.forEach(function(year, i) {
+                clone(main.traces[year]).forEach(function(trace) {
+                    if ('fill' in trace) {
+                        trace.fill = i > 0 ? 'tonexty' : 'tozeroy';
+                        trace.fillcolor = store.fillcolors[i % store.fillcolors.length];
+                    } else {
+                        trace.line.color = store.colors[i % store.colors.length];
+                    }
+                    mainData.push(trace);
+                });
+            });
+
+            // Annual charts: one point per selected year from the annual statistics
+            function annualFigure(chart) {
+                var data = clone(chart.data).map(function(trace, k) {
+                    trace.x = years;
+                    trace.y = years.map(function(year) { return store.annual[year][chart.columns[k]]; });
+                    return trace;
+                });
+                var fig = figure(data, chart.layout);
+                fig.layout.xaxis.tickvals = years;
+                return fig;
+            }
+
+            // Summary table: the YoY change depends on which years are selected
+            var rows = years.map(function(year, i) {
+                var row = clone(store.table.rows[year]);
+                var cell = {namespace: 'dash_html_components', type: 'Td', props: {children: '-'}};
+                if (i > 0) {
+                    var change = (store.annual[year].Mean / store.annual[years[i - 1]].Mean - 1) * 100;
+                    var yoy = Math.round(change * 100) / 100;
+                    cell.props.children = yoy.toFixed(2) + '%';
+                    cell.props.style = {color: yoy > 0 ? 'green' : yoy < 0 ? 'red' : 'black'};
+                }
+                row.props.children.push(cell);
+                return row;
+            });
+            var table = clone(store.table.shell);
+            table.props.children = [store.table.header].concat(rows);
+
+            return [
+                figure(mainData, main.layout),
+                annualFigure(store.stats),
+                annualFigure(store.volatility),
+                table
+            ];
+        }
+    }
+});